@@ -1,10 +1,16 @@
-import json
 from io import BytesIO
 
 from httpx import AsyncClient
 
+import ipfs_client.utils.json_codec as json_codec
+
+_DAG_PUT_URL = '/dag/put'
+_DAG_GET_URL = '/dag/get'
+
 
 class IPFSAsyncClientError(Exception):
+    __slots__ = ('_message',)
+
     def __init__(self, message: str):
         self._message = message
 
@@ -16,24 +22,33 @@ class IPFSAsyncClientError(Exception):
 
 
 class DAGBlock:
+    __slots__ = ('_dag_block_json',)
+
     def __init__(self, json_body: str):
         self._dag_block_json = json_body
 
     def as_json(self):
-        return json.loads(self._dag_block_json)
+        # parsed on every call so callers never share a mutable result, the
+        # raw block stays around for __str__
+        return json_codec.loads(self._dag_block_json)
 
     def __str__(self):
         return self._dag_block_json
 
 
 class DAGSection:
+    __slots__ = ('_client',)
+
     def __init__(self, async_client: AsyncClient):
         self._client: AsyncClient = async_client
 
     async def put(self, bytes_body: BytesIO, pin=True):
+        # the IPFS HTTP API only reads file arguments from a multipart body,
+        # a raw application/octet-stream payload is rejected by dag/put
         files = {'': bytes_body}
         r = await self._client.post(
-            url=f'/dag/put?pin={str(pin).lower()}',
+            url=_DAG_PUT_URL,
+            params={'pin': pin},
             files=files,
         )
         if r.status_code != 200:
@@ -41,13 +56,15 @@ class DAGSection:
                 f'IPFS client error: dag-put operation, response:{r}',
             )
         try:
-            return json.loads(r.text)
-        except json.JSONDecodeError:
+            return json_codec.loads(r.content)
+        except ValueError:
             return r.text
 
     async def get(self, dag_cid):
 
-        response = await self._client.post(url=f'/dag/get?arg={dag_cid}')
+        response = await self._client.post(
+            url=_DAG_GET_URL, params={'arg': dag_cid},
+        )
         if response.status_code != 200:
             raise IPFSAsyncClientError(
                 f'IPFS client error: dag-get operation, response:{response}',
@@ -3,14 +3,43 @@ import sys
 from loguru import logger
 
 FORMAT = '{time:MMMM D, YYYY > HH:mm:ss!UTC} | {level} | {message}| {extra}'
+_WARNING_NO = logger.level('WARNING').no
+_ERROR_NO = logger.level('ERROR').no
 
 
-logger.add(sys.stdout, level='DEBUG', format=FORMAT)
-logger.add(sys.stderr, level='WARNING', format=FORMAT)
-logger.add(
-    sys.stderr,
-    level='ERROR',
-    format=FORMAT,
-    backtrace=True,
-    diagnose=True,
-)
+def _is_ipfs_client_record(record) -> bool:
+    return (record['name'] or '').startswith('ipfs_client')
+
+
+# sinks only handle this library's records and leave every handler the
+# application registered in place. Variable dumps (diagnose) stay on the
+# ERROR sink. The flag lives on the shared loguru logger so a reload or a
+# second import of this module does not add the sinks again
+if not getattr(logger, '_ipfs_configured', False):
+    logger.add(
+        sys.stdout,
+        level='DEBUG',
+        format=FORMAT,
+        filter=lambda record: (
+            _is_ipfs_client_record(record) and
+            record['level'].no < _WARNING_NO
+        ),
+    )
+    logger.add(
+        sys.stderr,
+        level='WARNING',
+        format=FORMAT,
+        filter=lambda record: (
+            _is_ipfs_client_record(record) and
+            record['level'].no < _ERROR_NO
+        ),
+    )
+    logger.add(
+        sys.stderr,
+        level='ERROR',
+        format=FORMAT,
+        filter=_is_ipfs_client_record,
+        backtrace=True,
+        diagnose=True,
+    )
+    logger._ipfs_configured = True  # type: ignore[attr-defined]
@@ -1,6 +1,11 @@
-import json
+import asyncio
+from typing import Dict
+from typing import Optional
+from typing import Tuple
 from urllib.parse import urljoin
 
+import msgspec
+import orjson
 from httpx import AsyncClient
 from httpx import AsyncHTTPTransport
 from httpx import Limits
@@ -8,13 +13,62 @@ from httpx import Timeout
 
 import ipfs_client.exceptions
 import ipfs_client.utils.addr as addr_util
+import ipfs_client.utils.json_codec as json_codec
 from ipfs_client.dag import DAGSection
 from ipfs_client.dag import IPFSAsyncClientError
 from ipfs_client.default_logger import logger
 from ipfs_client.settings.data_models import IPFSConfig
 
+_ADD_URL = '/add'
+_ADD_PARAMS = {'cid-version': '1'}
+_CAT_URL = '/cat'
+_REMOTE_PIN_ADD_URL = '/pin/remote/add'
+_BOOL_STR = {True: 'true', False: 'false'}
+# larger advertised bodies are collected chunk by chunk instead of trusting
+# the server with an upfront allocation of that size
+_CAT_PREALLOC_MAX = 64 * 1024 * 1024
+
+_singleton_instances: Dict[
+    Tuple[str, Optional[asyncio.AbstractEventLoop]],
+    'AsyncIPFSClientSingleton',
+] = {}
+
+
+def _async_transport(settings: IPFSConfig) -> AsyncHTTPTransport:
+    conn_limits = settings.connection_limits
+    return AsyncHTTPTransport(
+        limits=Limits(
+            max_connections=conn_limits.max_connections,
+            max_keepalive_connections=conn_limits.max_keepalive_connections,
+            keepalive_expiry=conn_limits.keepalive_expiry,
+        ),
+        # negotiated through TLS ALPN, plain http endpoints stay on HTTP/1.1
+        http2=settings.http2,
+    )
+
+
+def _content_length(response) -> int:
+    # 0 when the header is missing or malformed
+    try:
+        return int(response.headers.get('content-length', 0))
+    except ValueError:
+        return 0
+
 
 class AsyncIPFSClient:
+    __slots__ = (
+        'dag',
+        '_base_url',
+        '_host_numeric',
+        '_logger',
+        '_settings',
+        '_write_mode',
+        '_remote_pin_enabled',
+        '_async_transport',
+        '_client',
+        '_remote_pin_add_params',
+    )
+
     _settings: IPFSConfig
     _client: AsyncClient
 
@@ -24,7 +78,7 @@ class AsyncIPFSClient:
             settings: IPFSConfig,
             api_base='api/v0',
             write_mode=False,
-
+            transport: Optional[AsyncHTTPTransport] = None,
     ):
         try:
             self._base_url, \
@@ -40,16 +94,11 @@ class AsyncIPFSClient:
         self._logger = logger.bind(module='IPFSAsyncClient')
         self._settings = settings
         self._write_mode = write_mode
+        self._async_transport = transport
 
     async def init_session(self):
-        conn_limits = self._settings.connection_limits
-        self._async_transport = AsyncHTTPTransport(
-            limits=Limits(
-                max_connections=conn_limits.max_connections,
-                max_keepalive_connections=conn_limits.max_connections,
-                keepalive_expiry=conn_limits.keepalive_expiry,
-            ),
-        )
+        if self._async_transport is None:
+            self._async_transport = _async_transport(self._settings)
         client_init_args = dict(
             base_url=self._base_url,
             timeout=Timeout(self._settings.timeout),
@@ -67,15 +116,16 @@ class AsyncIPFSClient:
             )
         self._client = AsyncClient(**client_init_args)
 
-        if self._settings.remote_pinning.enabled and self._write_mode:
+        # every remote pinning value comes from the same settings snapshot
+        remote_pinning = self._settings.remote_pinning
+        self._remote_pin_enabled = remote_pinning.enabled
+        if self._remote_pin_enabled and self._write_mode:
             # checking if service_name, service_endpoint, and service_token are
             # set, if not, raise an error
-            if not all(
-                    [
-                        self._settings.remote_pinning.service_name,
-                        self._settings.remote_pinning.service_endpoint,
-                        self._settings.remote_pinning.service_token,
-                    ],
+            if not (
+                remote_pinning.service_name and
+                remote_pinning.service_endpoint and
+                remote_pinning.service_token
             ):
                 raise ValueError(
                     'Remote pinning enabled but service_name, service_endpoint, or service_token not set',
@@ -84,14 +134,19 @@ class AsyncIPFSClient:
             # curl -X POST "http://127.0.0.1:5001/api/v0/pin/remote/service/add?arg=<service>&arg=<endpoint>&arg=<key>"
             # enable remote pinning service
             r = await self._client.post(
-                url=f'/pin/remote/service/add?arg={self._settings.remote_pinning.service_name}&arg={self._settings.remote_pinning.service_endpoint}&arg={self._settings.remote_pinning.service_token}',
+                url='/pin/remote/service/add',
+                params=[
+                    ('arg', remote_pinning.service_name),
+                    ('arg', remote_pinning.service_endpoint),
+                    ('arg', remote_pinning.service_token),
+                ],
             )
             if r.status_code != 200:
                 if r.status_code == 500:
                     # check for {"Message":"service already present","Code":0,"Type":"error"}
                     try:
-                        resp = json.loads(r.text)
-                    except json.JSONDecodeError:
+                        resp = orjson.loads(r.content)
+                    except orjson.JSONDecodeError:
                         raise IPFSAsyncClientError(
                             f'IPFS client error: remote pinning service add operation, response:{r}',
                         )
@@ -114,9 +169,20 @@ class AsyncIPFSClient:
                     'Remote pinning service added successfully',
                 )
 
+        if self._remote_pin_enabled:
+            # only the CID changes between remote pin requests
+            self._remote_pin_add_params = {
+                'service': remote_pinning.service_name,
+                'background': _BOOL_STR[bool(remote_pinning.background_pinning)],
+            }
+
         self.dag = DAGSection(self._client)
         self._logger.debug('Inited IPFS client on base url {}', self._base_url)
 
+    async def close_session(self):
+        # also closes the transport, including one shared with another client
+        await self._client.aclose()
+
     def add_str(self, string, **kwargs):
         # TODO
         pass
@@ -124,7 +190,8 @@ class AsyncIPFSClient:
     async def add_bytes(self, data: bytes, **kwargs):
         files = {'': data}
         r = await self._client.post(
-            url='/add?cid-version=1',
+            url=_ADD_URL,
+            params=_ADD_PARAMS,
             files=files,
         )
         if r.status_code != 200:
@@ -133,27 +200,29 @@ class AsyncIPFSClient:
             )
 
         try:
-            resp = json.loads(r.text)
-        except json.JSONDecodeError:
+            resp = orjson.loads(r.content)
+        except orjson.JSONDecodeError:
             return r.text
         else:
             generated_cid = resp['Hash']
 
-        if self._settings.remote_pinning.enabled:
+        if self._remote_pin_enabled:
             # curl -X POST "http://127.0.0.1:5001/api/v0/pin/remote/add?arg=<ipfs-path>&service=<value>&name=<value>&background=false"
             # pin to remote pinning service
             r = await self._client.post(
-                url=f'/pin/remote/add?arg={generated_cid}&service={self._settings.remote_pinning.service_name}&background={self._settings.remote_pinning.background_pinning}',
+                url=_REMOTE_PIN_ADD_URL,
+                params={'arg': generated_cid, **self._remote_pin_add_params},
             )
             if r.status_code != 200:
                 self._logger.error(
-                    f'IPFS client error: remote pinning add operation, response:{r}',
+                    'IPFS client error: remote pinning add operation, response:{}',
+                    r,
                 )
         return generated_cid
 
     async def add_json(self, json_obj, **kwargs):
         try:
-            json_data = json.dumps(json_obj).encode('utf-8')
+            json_data = json_codec.dumps(json_obj)
         except Exception as e:
             raise e
 
@@ -162,22 +231,36 @@ class AsyncIPFSClient:
 
     async def cat(self, cid, **kwargs):
         bytes_mode = kwargs.get('bytes_mode', False)
-        if not bytes_mode:
-            response_body = ''
-        else:
-            response_body = b''
+        chunks = []
         last_response_code = None
-        async with self._client.stream(method='POST', url=f'/cat?arg={cid}') as response:
+        async with self._client.stream(
+            method='POST', url=_CAT_URL, params={'arg': cid},
+        ) as response:
             if response.status_code != 200:
                 raise IPFSAsyncClientError(
                     f'IPFS client error: cat on CID {cid}, response status code error: {response.status_code}',
                 )
+            # text mode never uses the advertised length
+            content_length = _content_length(response) if bytes_mode else 0
             if not bytes_mode:
                 async for chunk in response.aiter_text():
-                    response_body += chunk
+                    chunks.append(chunk)
+                response_body = ''.join(chunks)
+            elif 0 < content_length <= _CAT_PREALLOC_MAX:
+                buf = bytearray(content_length)
+                offset = 0
+                async for chunk in response.aiter_bytes():
+                    chunk_len = len(chunk)
+                    # slice assignment grows the buffer in case the decoded
+                    # body turns out longer than the advertised length
+                    buf[offset:offset + chunk_len] = chunk
+                    offset += chunk_len
+                del buf[offset:]
+                response_body = bytes(buf)
             else:
                 async for chunk in response.aiter_bytes():
-                    response_body += chunk
+                    chunks.append(chunk)
+                response_body = b''.join(chunks)
             last_response_code = response.status_code
         if not response_body:
             raise IPFSAsyncClientError(
@@ -186,26 +269,132 @@ class AsyncIPFSClient:
         return response_body
 
     async def get_json(self, cid, **kwargs):
-        json_data = await self.cat(cid)
+        json_data = await self.cat(cid, bytes_mode=True)
         try:
-            return json.loads(json_data)
-        except json.JSONDecodeError:
-            return json_data
+            return json_codec.loads(json_data)
+        except ValueError:
+            return json_data.decode('utf-8', errors='replace')
+
+    async def get_json_as(self, cid, schema=None, **kwargs):
+        """Decode the JSON stored at `cid`, optionally into a msgspec
+        `schema` type. Unlike `get_json`, decode and validation errors are
+        raised instead of returning the raw payload. Prefer this over
+        `get_json` in hot loops."""
+        json_data = await self.cat(cid, bytes_mode=True)
+        if schema is None:
+            return msgspec.json.decode(json_data)
+        return msgspec.json.decode(json_data, type=schema)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
 
 
 class AsyncIPFSClientSingleton:
+    _settings_key: str
+    _registry_key: Tuple[str, Optional[asyncio.AbstractEventLoop]]
+
+    def __new__(cls, settings: IPFSConfig):
+        # one instance per distinct configuration and event loop, so callers
+        # sharing the same settings also share connection pools, while
+        # connections never outlive the loop they were opened on
+        settings_key = settings.json()
+        for key in [
+            key for key in _singleton_instances
+            if key[1] is not None and key[1].is_closed()
+        ]:
+            del _singleton_instances[key]
+        registry_key = (settings_key, _running_loop())
+        instance = _singleton_instances.get(registry_key)
+        if instance is None:
+            instance = super().__new__(cls)
+            instance._settings_key = settings_key
+            instance._registry_key = registry_key
+            _singleton_instances[registry_key] = instance
+        return instance
+
     def __init__(self, settings: IPFSConfig):
+        if hasattr(self, '_ipfs_write_client'):
+            return
+        self._settings = settings
+        self._build_clients()
+        self._initialized = False
+        self._init_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_refs = 0
+
+    def _build_clients(self):
+        settings = self._settings
+        # read and write clients pointed at the same node share a single
+        # connection pool
+        shared_transport = None
+        if settings.url == settings.reader_url:
+            shared_transport = _async_transport(settings)
         self._ipfs_write_client = AsyncIPFSClient(
             addr=settings.url, settings=settings, write_mode=True,
+            transport=shared_transport,
         )
         self._ipfs_read_client = AsyncIPFSClient(
             addr=settings.reader_url, settings=settings, write_mode=False,
+            transport=shared_transport,
         )
-        self._initialized = False
+
+    def _register(self, loop: asyncio.AbstractEventLoop):
+        registry_key = (self._settings_key, loop)
+        if registry_key != self._registry_key:
+            if _singleton_instances.get(self._registry_key) is self:
+                del _singleton_instances[self._registry_key]
+            self._registry_key = registry_key
+        _singleton_instances[registry_key] = self
 
     async def init_sessions(self):
-        if self._initialized:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # sessions opened on another (likely closed) loop cannot be
+            # reused, start over with fresh clients and a lock bound to
+            # this loop
+            if self._loop is not None:
+                self._build_clients()
+                self._initialized = False
+                self._session_refs = 0
+            self._loop = loop
+            self._init_lock = asyncio.Lock()
+        # a closed instance dropped itself from the registry, put it back so
+        # later lookups share it again
+        self._register(loop)
+        async with self._init_lock:
+            if not self._initialized:
+                await asyncio.gather(
+                    self._ipfs_write_client.init_session(),
+                    self._ipfs_read_client.init_session(),
+                )
+                self._initialized = True
+            self._session_refs += 1
+
+    async def close_sessions(self):
+        # sessions are only closed once every init_sessions() call has been
+        # matched by a close_sessions() call. The init lock keeps a close that
+        # races an init_sessions() call from losing its reference
+        if self._init_lock is None:
             return
-        await self._ipfs_write_client.init_session()
-        await self._ipfs_read_client.init_session()
-        self._initialized = True
+        async with self._init_lock:
+            if not self._initialized:
+                return
+            self._session_refs -= 1
+            if self._session_refs > 0:
+                return
+            if _singleton_instances.get(self._registry_key) is self:
+                del _singleton_instances[self._registry_key]
+            self._initialized = False
+            # closing the clients also closes their transports, so the next
+            # init_sessions() call starts from freshly built ones
+            write_client = self._ipfs_write_client
+            read_client = self._ipfs_read_client
+            self._build_clients()
+            await asyncio.gather(
+                write_client.close_session(),
+                read_client.close_session(),
+            )
@@ -4,8 +4,10 @@ from pydantic import BaseModel
 
 
 class ConnectionLimits(BaseModel):
+    # by default every pooled connection is kept alive, so repeated API calls
+    # skip a new TCP/TLS handshake
     max_connections: int = 100
-    max_keepalive_connections: int = 50
+    max_keepalive_connections: int = 100
     keepalive_expiry: int = 300
 
 
@@ -19,6 +21,9 @@ class ExternalAPIAuth(BaseModel):
     apiKey: str
     apiSecret: str = ''
 
+    class Config:
+        frozen = True
+
 
 class RemotePinningConfig(BaseModel):
     enabled: bool
@@ -27,6 +32,9 @@ class RemotePinningConfig(BaseModel):
     service_token: Optional[str] = ""
     background_pinning: Optional[bool] = False
 
+    class Config:
+        frozen = True
+
 
 class IPFSConfig(BaseModel):
     url: str
@@ -38,3 +46,6 @@ class IPFSConfig(BaseModel):
     local_cache_path: str
     connection_limits: ConnectionLimits
     remote_pinning: RemotePinningConfig
+    # opt-in: multiplex concurrent requests over one connection on TLS
+    # endpoints, requires the h2 package (httpx[http2])
+    http2: bool = False
@@ -0,0 +1,73 @@
+import multiaddr
+import pytest
+
+from ipfs_client.exceptions import AddressError
+from ipfs_client.utils.addr import _IP_TCP_MULTIADDR_RE
+from ipfs_client.utils.addr import _ip_tcp_netloc
+from ipfs_client.utils.addr import _multiaddr_netloc
+from ipfs_client.utils.addr import multiaddr_to_url_data
+
+# the regex fast path must agree with the multiaddr parser on every input it
+# accepts, and leave everything else to the parser
+VALID_ADDRS = [
+    '/ip4/127.0.0.1/tcp/5001',
+    '/ip4/127.0.0.1/tcp/0',
+    '/ip4/127.0.0.1/tcp/65535',
+    '/ip4/127.0.0.1/tcp/05001',
+    '/ip4/127.0.0.1/tcp/5001/http',
+    '/ip4/127.0.0.1/tcp/5001/https',
+    '/ip6/::1/tcp/5001',
+    '/ip6/::1/tcp/5001/https',
+    '/ip6/0:0:0:0:0:0:0:1/tcp/5001',
+    '/ip6/2001:DB8::1/tcp/443/https',
+    '/dns/localhost/tcp/5001',
+    '/dns4/example.com/tcp/443/https',
+    '/dns6/example.com/tcp/1',
+]
+
+INVALID_ADDRS = [
+    '',
+    '/',
+    'http://127.0.0.1:5001',
+    '/ip4/127.0.0.1',
+    '/ip4/127.0.0.1/udp/5001',
+    '/ip4/127.0.0.1/tcp/65536',
+    '/ip6/::1/tcp/99999',
+    '/ip4/127.000.0.1/tcp/5001',
+    '/ip4/300.0.0.1/tcp/5001',
+    '/ip4/127.0.0.1/tcp/5001/ws',
+    '/ip4/127.0.0.1/tcp/5001/http/extra',
+    '/ip4/127.0.0.1/tcp/5001/https/http',
+]
+
+
+@pytest.mark.parametrize('addr', VALID_ADDRS)
+def test_fast_path_matches_parser(addr):
+    netloc, secure, host_numeric = _multiaddr_netloc(addr)
+    fast_match = _IP_TCP_MULTIADDR_RE.match(addr)
+    if fast_match is not None:
+        url_data = _ip_tcp_netloc(*fast_match.groups())
+        if url_data is not None:
+            assert url_data == (netloc, secure)
+            assert host_numeric
+    scheme = 'https' if secure else 'http'
+    assert multiaddr_to_url_data(addr, 'api/v0') == (
+        f'{scheme}://{netloc}/api/v0/', host_numeric,
+    )
+
+
+@pytest.mark.parametrize('addr', INVALID_ADDRS)
+def test_invalid_addrs_raise(addr):
+    with pytest.raises(AddressError):
+        _multiaddr_netloc(addr)
+    with pytest.raises(AddressError):
+        multiaddr_to_url_data(addr, 'api/v0')
+
+
+def test_multiaddr_object_and_bytes_forms():
+    # a Multiaddr object and its bytes form hash alike, both must resolve
+    addr = multiaddr.Multiaddr('/ip4/127.0.0.1/tcp/5001')
+    expected = ('http://127.0.0.1:5001/api/v0/', True)
+    assert multiaddr_to_url_data(addr, 'api/v0') == expected
+    assert multiaddr_to_url_data(addr.to_bytes(), 'api/v0') == expected
+    assert multiaddr_to_url_data(str(addr), 'api/v0') == expected
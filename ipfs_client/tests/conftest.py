@@ -0,0 +1,129 @@
+import os
+
+import pytest
+import pytest_asyncio
+from pytest_asyncio import is_async_test
+
+from ipfs_client.main import AsyncIPFSClientSingleton
+from ipfs_client.settings.data_models import ConnectionLimits
+from ipfs_client.settings.data_models import ExternalAPIAuth
+from ipfs_client.settings.data_models import IPFSConfig
+from ipfs_client.settings.data_models import IPFSWriterRateLimit
+from ipfs_client.settings.data_models import RemotePinningConfig
+
+
+def pytest_collection_modifyitems(items):
+    # session-scoped clients hold connections bound to the loop they were
+    # created on, so every test runs on the same session loop
+    session_loop_marker = pytest.mark.asyncio(loop_scope='session')
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop_marker, append=False)
+
+
+# environment shared by all tests, read once per session:
+# IPFS_URL=https://ipfs.infura.io:5001 IPFS_AUTH_API_KEY=your_api_key
+# IPFS_AUTH_API_SECRET=your_api_secret
+# REMOTE_PINNING_SERVICE_NAME=... REMOTE_PINNING_SERVICE_ENDPOINT=...
+# REMOTE_PINNING_SERVICE_TOKEN=... IPFS_TEST_BINARY_FILE=/path/to/binary/file
+@pytest.fixture(scope='session')
+def test_env():
+    return {
+        'ipfs_url': os.getenv('IPFS_URL', 'http://localhost:5001'),
+        'ipfs_auth_api_key': os.getenv('IPFS_AUTH_API_KEY', None),
+        'ipfs_auth_api_secret': os.getenv('IPFS_AUTH_API_SECRET', None),
+        'remote_pinning_service_name': os.getenv(
+            'REMOTE_PINNING_SERVICE_NAME', None,
+        ),
+        'remote_pinning_service_endpoint': os.getenv(
+            'REMOTE_PINNING_SERVICE_ENDPOINT', None,
+        ),
+        'remote_pinning_service_token': os.getenv(
+            'REMOTE_PINNING_SERVICE_TOKEN', None,
+        ),
+        'binary_file_path': os.getenv('IPFS_TEST_BINARY_FILE', None),
+    }
+
+
+@pytest.fixture(scope='session')
+def binary_file_path(test_env):
+    if not test_env['binary_file_path']:
+        pytest.skip('IPFS_TEST_BINARY_FILE not set')
+    return test_env['binary_file_path']
+
+
+def _ipfs_config(test_env, remote_pinning: RemotePinningConfig) -> IPFSConfig:
+    ipfs_auth_api_key = test_env['ipfs_auth_api_key']
+    ipfs_auth_api_secret = test_env['ipfs_auth_api_secret']
+    auth = None
+    if all([ipfs_auth_api_key, ipfs_auth_api_secret]):
+        auth = ExternalAPIAuth(
+            apiKey=ipfs_auth_api_key,
+            apiSecret=ipfs_auth_api_secret,
+        )
+    return IPFSConfig(
+        url=test_env['ipfs_url'],
+        url_auth=auth,
+        reader_url=test_env['ipfs_url'],
+        reader_url_auth=auth,
+        write_rate_limit=IPFSWriterRateLimit(
+            req_per_sec=10, burst=10,   # 10 requests per second, burst 10
+        ),  # 10 requests per second, burst 10
+        timeout=60,
+        local_cache_path='/tmp/ipfs_cache',
+        connection_limits=ConnectionLimits(
+            max_connections=10,
+            max_keepalive_connections=10,
+            keepalive_expiry=300,
+        ),
+        remote_pinning=remote_pinning,
+    )
+
+
+@pytest.fixture(scope='session')
+def settings(test_env):
+    return _ipfs_config(
+        test_env,
+        RemotePinningConfig(
+            enabled=False,
+            service_name='',
+            service_endpoint='',
+            service_token='',
+        ),
+    )
+
+
+@pytest.fixture(scope='session')
+def remote_pinning_settings(test_env):
+    if not all([
+        test_env['remote_pinning_service_name'],
+        test_env['remote_pinning_service_endpoint'],
+        test_env['remote_pinning_service_token'],
+    ]):
+        pytest.skip('REMOTE_PINNING_SERVICE_* not set')
+    return _ipfs_config(
+        test_env,
+        RemotePinningConfig(
+            enabled=True,
+            service_name=test_env['remote_pinning_service_name'],
+            service_endpoint=test_env['remote_pinning_service_endpoint'],
+            service_token=test_env['remote_pinning_service_token'],
+            background_pinning=False,
+        ),
+    )
+
+
+@pytest_asyncio.fixture(scope='session', loop_scope='session')
+async def ipfs_client(settings):
+    client = AsyncIPFSClientSingleton(settings=settings)
+    await client.init_sessions()
+    yield client
+    await client.close_sessions()
+
+
+@pytest_asyncio.fixture(scope='session', loop_scope='session')
+async def remote_pinning_ipfs_client(remote_pinning_settings):
+    client = AsyncIPFSClientSingleton(settings=remote_pinning_settings)
+    await client.init_sessions()
+    yield client
+    await client.close_sessions()
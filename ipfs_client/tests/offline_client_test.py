@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import math
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import List
+
+import httpx
+import msgspec
+import orjson
+import pytest
+
+from ipfs_client.dag import DAGBlock
+from ipfs_client.main import _async_transport
+from ipfs_client.main import _singleton_instances
+from ipfs_client.main import AsyncIPFSClient
+from ipfs_client.main import AsyncIPFSClientSingleton
+from ipfs_client.settings.data_models import ConnectionLimits
+from ipfs_client.settings.data_models import IPFSConfig
+from ipfs_client.settings.data_models import IPFSWriterRateLimit
+from ipfs_client.settings.data_models import RemotePinningConfig
+
+# these tests run against an in-memory IPFS API, no daemon is required
+
+
+class FakeIPFSNode:
+    def __init__(self, cat_headers=None):
+        self.blocks = {}
+        # extra headers sent with /cat responses
+        self.cat_headers = cat_headers or {}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith('/add'):
+            # the single multipart part is framed by boundary lines
+            body = request.read()
+            data = body.split(b'\r\n\r\n', 1)[1].rsplit(b'\r\n--', 1)[0]
+            cid = 'bafk' + hashlib.sha256(data).hexdigest()[:40]
+            self.blocks[cid] = data
+            return httpx.Response(200, json={'Hash': cid})
+        if path.endswith('/cat'):
+            return httpx.Response(
+                200, content=self.blocks[request.url.params['arg']],
+                headers=self.cat_headers,
+            )
+        return httpx.Response(404)
+
+    def transport(self):
+        return httpx.MockTransport(self.handler)
+
+
+@pytest.fixture(scope='module')
+def ipfs_node_url():
+    # the same fake node served over a real local socket, for clients that
+    # build their own transports and keep connections alive between requests
+    node = FakeIPFSNode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            response = node.handler(
+                httpx.Request(
+                    'POST', f'http://{self.headers["Host"]}{self.path}',
+                    headers=dict(self.headers), content=body,
+                ),
+            )
+            self.send_response(response.status_code)
+            self.send_header('Content-Length', str(len(response.content)))
+            self.end_headers()
+            self.wfile.write(response.content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield 'http://127.0.0.1:{0}'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def ipfs_config(url='http://127.0.0.1:5001'):
+    return IPFSConfig(
+        url=url,
+        reader_url=url,
+        write_rate_limit=IPFSWriterRateLimit(req_per_sec=10, burst=10),
+        timeout=5,
+        local_cache_path='/tmp/ipfs_cache',
+        connection_limits=ConnectionLimits(),
+        remote_pinning=RemotePinningConfig(enabled=False),
+    )
+
+
+def test_transport_connection_limits():
+    settings = ipfs_config().copy(
+        update={
+            'connection_limits': ConnectionLimits(
+                max_connections=10,
+                max_keepalive_connections=5,
+                keepalive_expiry=60,
+            ),
+        },
+    )
+    pool = _async_transport(settings)._pool
+    assert pool._max_connections == 10
+    assert pool._max_keepalive_connections == 5
+    assert pool._keepalive_expiry == 60
+
+
+async def test_add_json_non_str_keys():
+    node = FakeIPFSNode()
+    client = AsyncIPFSClient(
+        addr='http://127.0.0.1:5001', settings=ipfs_config(),
+        write_mode=True, transport=node.transport(),
+    )
+    await client.init_session()
+    cid = await client.add_json({1: 'a', 'b': 2})
+    assert orjson.loads(node.blocks[cid]) == {'1': 'a', 'b': 2}
+    assert await client.get_json(cid) == {'1': 'a', 'b': 2}
+    await client.close_session()
+
+
+async def test_json_big_ints_and_nan_roundtrip():
+    node = FakeIPFSNode()
+    client = AsyncIPFSClient(
+        addr='http://127.0.0.1:5001', settings=ipfs_config(),
+        write_mode=True, transport=node.transport(),
+    )
+    await client.init_session()
+    # uint256 sized values must survive exactly, not as floats
+    payload = {'wei': 10**20, 'supply': 123456789012345678901234567890}
+    cid = await client.add_json(payload)
+    assert await client.get_json(cid) == payload
+    cid = await client.add_json({'ratio': float('nan'), 'missing': None})
+    assert node.blocks[cid] == b'{"ratio":NaN,"missing":null}'
+    assert math.isnan((await client.get_json(cid))['ratio'])
+    await client.close_session()
+
+
+def test_dag_block_big_ints():
+    block = DAGBlock('{"v":123456789012345678901234567890}')
+    assert block.as_json() == {'v': 123456789012345678901234567890}
+
+
+def test_dag_block_str_is_raw_block():
+    raw = '{"v": 1.0, "big": 123456789012345678901234567890}'
+    block = DAGBlock(raw)
+    assert str(block) == raw
+    parsed = block.as_json()
+    assert str(block) == raw
+    # every call hands out its own object
+    parsed['v'] = 2
+    assert block.as_json() == {'v': 1.0, 'big': 123456789012345678901234567890}
+
+
+class Snapshot(msgspec.Struct):
+    epoch: int
+    cids: List[str]
+
+
+async def test_get_json_as():
+    node = FakeIPFSNode()
+    client = AsyncIPFSClient(
+        addr='http://127.0.0.1:5001', settings=ipfs_config(),
+        write_mode=True, transport=node.transport(),
+    )
+    await client.init_session()
+    payload = {'epoch': 123456789012345678901234567890, 'cids': ['bafk1']}
+    cid = await client.add_json(payload)
+    assert await client.get_json_as(cid) == payload
+    assert await client.get_json_as(cid, schema=Snapshot) == Snapshot(
+        epoch=123456789012345678901234567890, cids=['bafk1'],
+    )
+    # unlike get_json, validation errors reach the caller
+    cid = await client.add_json({'epoch': 'one', 'cids': []})
+    with pytest.raises(msgspec.ValidationError):
+        await client.get_json_as(cid, schema=Snapshot)
+    await client.close_session()
+
+
+@pytest.mark.parametrize(
+    'content_length', ['not-a-number', str(2**40), '3'],
+)
+async def test_cat_untrusted_content_length(content_length):
+    node = FakeIPFSNode(cat_headers={'content-length': content_length})
+    client = AsyncIPFSClient(
+        addr='http://127.0.0.1:5001', settings=ipfs_config(),
+        write_mode=True, transport=node.transport(),
+    )
+    await client.init_session()
+    cid = await client.add_bytes(b'cat body')
+    assert await client.cat(cid) == 'cat body'
+    assert await client.cat(cid, bytes_mode=True) == b'cat body'
+    await client.close_session()
+
+
+async def _roundtrip(client: AsyncIPFSClientSingleton, data: bytes):
+    cid = await client._ipfs_write_client.add_bytes(data)
+    assert await client._ipfs_read_client.cat(cid, bytes_mode=True) == data
+
+
+async def test_singleton_session_refcounting(ipfs_node_url):
+    client = AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url))
+    assert AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url)) is client
+    await client.init_sessions()
+    await client.init_sessions()
+    await client.close_sessions()
+    # still referenced by the first init_sessions() call
+    await _roundtrip(client, b'refcounted')
+    await client.close_sessions()
+    assert client not in _singleton_instances.values()
+    assert AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url)) is not client
+
+
+async def test_singleton_reinit_after_close(ipfs_node_url):
+    client = AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url))
+    await client.init_sessions()
+    await client.close_sessions()
+    await client.init_sessions()
+    # registered again, so later lookups share the re-initialized sessions
+    assert AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url)) is client
+    await _roundtrip(client, b'reinitialized')
+    await client.close_sessions()
+    assert client not in _singleton_instances.values()
+
+
+async def test_singleton_close_waits_for_init(ipfs_node_url):
+    client = AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url))
+    # the close issued while the first init is still running pairs with it
+    await asyncio.gather(client.init_sessions(), client.close_sessions())
+    assert client not in _singleton_instances.values()
+    assert AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url)) is not client
+
+
+def test_singleton_across_event_loops(ipfs_node_url):
+    async def use_client(close):
+        client = AsyncIPFSClientSingleton(ipfs_config(ipfs_node_url))
+        await client.init_sessions()
+        await _roundtrip(client, b'across loops')
+        if close:
+            await client.close_sessions()
+        return client
+
+    # the first loop closes with a pooled keep-alive connection still open
+    first = asyncio.run(use_client(close=False))
+    second = asyncio.run(use_client(close=True))
+    assert second is not first
+    assert first not in _singleton_instances.values()
+
+    # an instance held across loops starts over with fresh sessions
+    async def reuse_held_instance():
+        await first.init_sessions()
+        await _roundtrip(first, b'held instance')
+        await first.close_sessions()
+
+    asyncio.run(reuse_held_instance())
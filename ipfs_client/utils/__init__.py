@@ -1,5 +1,7 @@
 from . import addr
+from . import json_codec
 
 __all__ = [
     'addr',
+    'json_codec',
 ]
@@ -1,8 +1,9 @@
+import functools
+import ipaddress
+import re
 import socket
-import urllib.parse
 
 import multiaddr.exceptions
-import validators
 from multiaddr.protocols import P_HTTP
 from multiaddr.protocols import P_HTTPS
 from multiaddr.protocols import P_IP4
@@ -14,10 +15,34 @@ from ipfs_client.exceptions import AddressError
 
 AF_UNIX = getattr(socket, 'AF_UNIX', NotImplemented)
 
+# http(s) scheme followed by a non-empty, whitespace free host and path
+_URL_RE = re.compile(r'^https?://[^\s/$.?#]\S*$', re.IGNORECASE)
 
-def multiaddr_to_url_data(
-        addr, base: str,  # type: ignore[no-any-unimported]
-):
+# the common /ip4|ip6/<host>/tcp/<port>[/http|/https] daemon address shape
+_IP_TCP_MULTIADDR_RE = re.compile(
+    r'^/ip([46])/([0-9a-fA-F:.]+)/tcp/(0|[1-9][0-9]{0,4})(?:/(https?))?$',
+)
+
+
+def _ip_tcp_netloc(ip_version, host, port, app_proto):
+    """Fast path for `_IP_TCP_MULTIADDR_RE` matches. Returns None unless the
+    host and port are already in canonical form, leaving normalization and
+    error reporting to the multiaddr parser."""
+    try:
+        if ip_version == '4':
+            canonical_host = str(ipaddress.IPv4Address(host))
+        else:
+            canonical_host = str(ipaddress.IPv6Address(host))
+    except ValueError:
+        return None
+    if canonical_host != host or int(port) > 65535:
+        return None
+    if ip_version == '6':
+        host = '[{0}]'.format(host)
+    return '{0}:{1}'.format(host, port), app_proto == 'https'
+
+
+def _multiaddr_netloc(addr):
     try:
         multi_addr = multiaddr.Multiaddr(addr)
     except multiaddr.exceptions.ParseError as error:
@@ -29,14 +54,16 @@ def multiaddr_to_url_data(
         # Read host value
         proto, host = next(addr_iter)
         host_numeric = proto.code in (P_IP4, P_IP6)
+        host_is_ip6 = proto.code == P_IP6
 
         # Read port value for IP-based transports
         proto, port = next(addr_iter)
         if proto.code != P_TCP:
             raise AddressError(addr)
 
-        # Pre-format network location URL part based on host+port
-        if ':' in host and not host.startswith('['):
+        # Pre-format network location URL part based on host+port, IPv6
+        # literals need brackets to be told apart from the port
+        if host_is_ip6:
             netloc = '[{0}]:{1}'.format(host, port)
         else:
             netloc = '{0}:{1}'.format(host, port)
@@ -60,21 +87,56 @@ def multiaddr_to_url_data(
     except StopIteration:
         raise AddressError(addr) from None
 
+    return netloc, secure, host_numeric
+
+
+def multiaddr_to_url_data(
+        addr, base: str,  # type: ignore[no-any-unimported]
+):
+    # only textual addresses are memoized: a Multiaddr object hashes like its
+    # bytes form but cannot be compared with it, so mixing both as cache keys
+    # breaks the lookup
+    if isinstance(addr, str):
+        return _cached_str_multiaddr_to_url_data(addr, base)
+    return _multiaddr_to_url_data(addr, base)
+
+
+def _multiaddr_to_url_data(addr, base: str):
+    # textual multiaddrs always start with a protocol path, anything else
+    # (e.g. a plain URL) can be rejected without invoking the parser
+    if isinstance(addr, str) and not addr.startswith('/'):
+        raise AddressError(addr)
+
+    url_data = None
+    if isinstance(addr, str):
+        fast_match = _IP_TCP_MULTIADDR_RE.match(addr)
+        if fast_match is not None:
+            url_data = _ip_tcp_netloc(*fast_match.groups())
+    if url_data is not None:
+        netloc, secure = url_data
+        host_numeric = True
+    else:
+        netloc, secure, host_numeric = _multiaddr_netloc(addr)
+
+    if not base.startswith('/'):
+        base = '/' + base
     if not base.endswith('/'):
         base += '/'
 
     # Convert the parsed `addr` values to a URL base and parameters for the
-    # HTTP library
-    base_url = urllib.parse.SplitResult(
-        scheme='http' if not secure else 'https',
-        netloc=netloc,
-        path=base,
-        query='',
-        fragment='',
-    ).geturl()
+    # HTTP library. netloc is built from host+port above and base is wrapped
+    # in slashes, so plain formatting yields the same URL as urlunsplit would
+    scheme = 'http' if not secure else 'https'
+    base_url = f'{scheme}://{netloc}{base}'
 
     return base_url, host_numeric
 
 
+# failed parses raise and are therefore never cached
+_cached_str_multiaddr_to_url_data = functools.lru_cache(maxsize=256)(
+    _multiaddr_to_url_data,
+)
+
+
 def is_valid_url(url):
-    return validators.url(url)
+    return bool(_URL_RE.match(url))
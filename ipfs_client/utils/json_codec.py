@@ -0,0 +1,40 @@
+import json
+
+import msgspec
+import orjson
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def dumps(obj) -> bytes:
+    # json.dumps accepted and stringified non-str dict keys, keep doing so
+    try:
+        data = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # orjson rejects integers wider than 64 bits (e.g. uint256 wei
+        # amounts), json.dumps encodes them exactly
+        return _stdlib_dumps(obj)
+    if b'null' in data:
+        # orjson writes NaN and Infinity as null where json.dumps kept them,
+        # only payloads that could contain such a float pay for the check
+        try:
+            json.dumps(obj, allow_nan=False)
+        except ValueError:
+            return _stdlib_dumps(obj)
+        except TypeError:
+            # a type only orjson can serialize, its output stands
+            pass
+    return data
+
+
+def loads(data):
+    # msgspec keeps integers of any width exact, where orjson silently
+    # turns those wider than 64 bits into floats
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError:
+        # NaN and Infinity are not JSON, but json.dumps writes them and
+        # json.loads reads them back. Raises a ValueError on invalid input
+        return json.loads(data)